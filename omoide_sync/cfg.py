@@ -1,8 +1,10 @@
 """Global configuration."""
 
+import functools
 from pathlib import Path
 from uuid import UUID
 
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 from pydantic_settings import SettingsConfigDict
 from typing_extensions import TypedDict
@@ -27,23 +29,35 @@ class Config(BaseSettings):
     trash_folder: Path
     dry_run: bool = False
     log_level: str = 'INFO'
-    supported_formats: set[str] = {
-        '.png',
-        '.jpg',
-        '.jpeg',
-        '.webp',
-    }
+    supported_formats: frozenset[str] = frozenset(
+        {
+            '.png',
+            '.jpg',
+            '.jpeg',
+            '.webp',
+        }
+    )
     wait_for_upload: int = 600
     wait_after_upload: int = 0
-    wait_step_for_upload: int = 5
-    wait_for_page_load: float = 1.0
+    wait_step_for_upload: float = 0.5
+    page_load_timeout: float = 10.0
     request_timeout: float = 5.0
+    http_concurrency: int = 4
+    cache_path: Path | None = None
+    cache_ttl: int = 86400
 
     model_config = SettingsConfigDict(
         env_prefix='OMOIDE_SYNC__',
     )
 
+    @field_validator('supported_formats')
+    @classmethod
+    def normalize_formats(cls, value: frozenset[str]) -> frozenset[str]:
+        """Store formats as lowercase extensions with leading dot."""
+        return frozenset('.' + each.lstrip('.').lower() for each in value)
+
 
+@functools.cache
 def get_config() -> Config:
     """Return Config instance."""
     return Config()
@@ -1,19 +1,24 @@
 """HTTP client that interacts with the API."""
 
 from abc import ABC
-import datetime
 import http
-import json
+import http.cookiejar
 import logging
+import os
+from pathlib import Path
 import time
 from typing import Any
 from uuid import UUID
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from selenium import webdriver
 import selenium.common.exceptions
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.support.ui import WebDriverWait
+from urllib3.util import Retry
 
 from omoide_sync import cfg
 from omoide_sync import exceptions
@@ -22,6 +27,40 @@ from omoide_sync import models
 
 LOG = logging.getLogger(__name__)
 
+DEFAULT_HEADERS = {
+    'Content-Type': 'application/json; charset=UTF-8',
+}
+
+# how often to report that we're still waiting for the upload, seconds
+UPLOAD_REPORT_INTERVAL = 5.0
+
+# checked in the browser, so every poll costs one round trip
+UPLOAD_READY_SCRIPT = """
+return document.evaluate(
+    '//span[text()="Ready for new batch"]',
+    document,
+    null,
+    XPathResult.FIRST_ORDERED_NODE_TYPE,
+    null
+).singleNodeValue !== null;
+"""
+
+
+# turns on simplified upload and returns file input, all in one round trip
+PREPARE_UPLOAD_SCRIPT = """
+const checkbox = document.getElementById('auto-continue');
+const input = document.getElementById('upload-input');
+if (checkbox === null || input === null) {
+    return null;
+}
+checkbox.scrollIntoView();
+if (!checkbox.checked) {
+    checkbox.click();
+}
+input.scrollIntoView();
+return input;
+"""
+
 
 class _SeleniumClientBase(interfaces.AbsClient, ABC):
     """API client."""
@@ -30,7 +69,25 @@ class _SeleniumClientBase(interfaces.AbsClient, ABC):
         """Initialize instance."""
         self.config = config
         self._item_cache: dict[UUID, models.Item] = {}
+        # None means that API has no such item
+        self._uuid_by_name: dict[tuple[str, str], UUID | None] = {}
+        # when UUID was got from the API, for items known from previous runs
+        self._found_at: dict[tuple[str, str], float] = {}
         self._driver: WebDriver | None = None
+        self._session: requests.Session | None = None
+        self._logged_in_as: str | None = None
+
+        base_url = config.url.rstrip('/')
+        self._items_url = f'{base_url}/api/items'
+        self._upload_url = f'{base_url}/upload'
+
+        if base_url.startswith('https://'):
+            self._auth_prefix = 'https://'
+            self._auth_url_end = base_url[8:]
+        else:
+            # noinspection HttpUrlsUsage
+            self._auth_prefix = 'http://'
+            self._auth_url_end = base_url[7:]
 
     @property
     def driver(self) -> WebDriver:
@@ -40,46 +97,103 @@ class _SeleniumClientBase(interfaces.AbsClient, ABC):
             raise exceptions.ConfigRelatedError(msg)
         return self._driver
 
+    @property
+    def session(self) -> requests.Session:
+        """Return HTTP session instance."""
+        if self._session is None:
+            msg = 'HTTP session is not initialized'
+            raise exceptions.ConfigRelatedError(msg)
+        return self._session
+
+    def _load_known_items(self, path: Path) -> None:
+        """Restore UUIDs that were found during previous runs."""
+        oldest = time.time() - self.config.cache_ttl
+        uuid_by_name: dict[tuple[str, str], UUID | None] = {}
+        found_at: dict[tuple[str, str], float] = {}
+
+        try:
+            for login, name, raw_uuid, when in orjson.loads(path.read_bytes()):
+                if when >= oldest:
+                    uuid_by_name[(login, name)] = UUID(raw_uuid)
+                    found_at[(login, name)] = when
+        except FileNotFoundError:
+            return
+        except (OSError, AttributeError, TypeError, ValueError) as exc:
+            # cache is optional, broken file is the same as no file
+            LOG.warning('Ignoring malformed cache file %s: %s', path, exc)
+            return
+
+        self._uuid_by_name.update(uuid_by_name)
+        self._found_at.update(found_at)
+
+    def _save_known_items(self, path: Path) -> None:
+        """Save found UUIDs for next runs."""
+        now = time.time()
+        records = [
+            (login, name, str(uuid), self._found_at.get((login, name), now))
+            for (login, name), uuid in self._uuid_by_name.items()
+            if uuid is not None
+        ]
+
+        # write aside and swap, so interrupted run cannot corrupt the file
+        tmp_path = path.with_name(f'{path.name}.tmp')
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(orjson.dumps(records))
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            # must not hide the actual error of the run
+            LOG.warning('Failed to save cache file %s: %s', path, exc)
+
+    def _forget_item(self, item: models.Item) -> None:
+        """Drop known UUID of the item, so it will be looked up again."""
+        name_key = (item.owner.login, item.name)
+        self._uuid_by_name.pop(name_key, None)
+        self._found_at.pop(name_key, None)
+
+        if item.uuid:
+            self._item_cache.pop(item.uuid, None)
+
     def _make_auth_url(self, item: models.Item) -> str:
         """Make url that will allow us to login."""
-        if self.config.url.startswith('https://'):
-            prefix = 'https://'
-            url_end = self.config.url[8:]
-        else:
-            # noinspection HttpUrlsUsage
-            prefix = 'http://'
-            url_end = self.config.url[7:]
-
-        return f'{prefix}{item.owner.login}:{item.owner.password}@{url_end}'
+        return (
+            f'{self._auth_prefix}{item.owner.login}:{item.owner.password}'
+            f'@{self._auth_url_end}'
+        )
 
     def _wait_for_upload(self, item: models.Item, timeout: int) -> None:
         """Wait for uploading to complete."""
-        deadline = datetime.datetime.now(
-            tz=datetime.timezone.utc
-        ) + datetime.timedelta(seconds=timeout)
-
-        while datetime.datetime.now(tz=datetime.timezone.utc) < deadline:
-            try:
-                self.driver.find_element(
-                    'xpath',
-                    '//span[text()="Ready for new batch"]',
-                )
-            except selenium.common.exceptions.NoSuchElementException:
+        wait = WebDriverWait(
+            self.driver,
+            timeout,
+            poll_frequency=self.config.wait_step_for_upload,
+        )
+
+        next_report = time.monotonic() + UPLOAD_REPORT_INTERVAL
+
+        def upload_is_done(driver: WebDriver) -> bool:
+            """Check upload status, reporting progress from time to time."""
+            nonlocal next_report
+            if driver.execute_script(UPLOAD_READY_SCRIPT):
+                return True
+
+            if time.monotonic() >= next_report:
                 LOG.info('Still waiting %s to upload', item)
-                time.sleep(self.config.wait_step_for_upload)
-            else:
-                LOG.info('Done uploading %s', item)
-                return
+                next_report = time.monotonic() + UPLOAD_REPORT_INTERVAL
+
+            return False
 
-        msg = f'Failed to upload {item} even after {deadline} seconds'
-        raise exceptions.NetworkRelatedError(msg)
+        try:
+            wait.until(upload_is_done)
+        except selenium.common.exceptions.TimeoutException as exc:
+            msg = f'Failed to upload {item} even after {timeout} seconds'
+            raise exceptions.NetworkRelatedError(msg) from exc
+
+        LOG.info('Done uploading %s', item)
 
     def _common_request_args(self, item: models.Item) -> dict[str, Any]:
         """Return common arguments for all requests."""
         return {
-            'headers': {
-                'Content-Type': 'application/json; charset=UTF-8',
-            },
             'auth': (
                 item.owner.login,
                 item.owner.password,
@@ -100,54 +214,103 @@ class SeleniumClient(_SeleniumClientBase):
             options=options,
         )
         self._driver = driver
+        # one session for all users, so connections are kept alive
+        # and reused instead of doing new handshake on every request
+        session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+        # session is shared by all users, so it must not keep cookies
+        # that the server sets for one of them
+        session.cookies.set_policy(
+            http.cookiejar.DefaultCookiePolicy(allowed_domains=[])
+        )
+        adapter = HTTPAdapter(
+            pool_maxsize=self.config.http_concurrency,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=(
+                    http.HTTPStatus.BAD_GATEWAY,
+                    http.HTTPStatus.SERVICE_UNAVAILABLE,
+                    http.HTTPStatus.GATEWAY_TIMEOUT,
+                ),
+                # give last response back, so we could report it
+                raise_on_status=False,
+            ),
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        self._session = session
+
+        if self.config.cache_path is not None:
+            self._load_known_items(self.config.cache_path)
 
     def stop(self) -> None:
         """Finish work."""
         self.driver.close()
         self.driver.quit()
+        self.session.close()
+
+        if self.config.cache_path is not None:
+            self._save_known_items(self.config.cache_path)
 
     def get_item(self, item: models.Item) -> models.Item | None:
         """Return Item from the API."""
-        if item.uuid and (cached := self._item_cache.get(item.uuid)):
-            return cached
+        name_key = (item.owner.login, item.name)
 
-        payload = json.dumps(
+        if item.uuid:
+            if cached := self._item_cache.get(item.uuid):
+                return cached
+        elif name_key in self._uuid_by_name:
+            uuid = self._uuid_by_name[name_key]
+            if uuid is None:
+                return None
+            item.uuid = uuid
+            self._item_cache[uuid] = item
+            return item
+
+        payload = orjson.dumps(
             {
                 'name': item.name,
-            },
-            ensure_ascii=False,
+            }
         )
 
         if item.uuid:
-            r = requests.get(  # noqa: S113
-                f'{self.config.url}/api/items/{item.uuid}',
+            r = self.session.get(
+                f'{self._items_url}/{item.uuid}',
                 **self._common_request_args(item),
             )
 
         else:
-            r = requests.get(  # noqa: S113
-                f'{self.config.url}/api/items/by-name',
-                data=payload.encode('utf-8'),
+            r = self.session.get(
+                f'{self._items_url}/by-name',
+                data=payload,
                 **self._common_request_args(item),
             )
 
-        if r.status_code == http.HTTPStatus.NOT_FOUND:
+        status = r.status_code
+
+        if status == http.HTTPStatus.NOT_FOUND:
+            if item.uuid:
+                # UUID could be remembered from previous runs
+                self._forget_item(item)
+            else:
+                self._uuid_by_name[name_key] = None
             return None
 
-        if r.status_code != http.HTTPStatus.OK:
+        if status != http.HTTPStatus.OK:
             if item.uuid:
-                msg = (
-                    f'Failed to get item {item}: ' f'{r.status_code} {r.text}'
-                )
+                self._forget_item(item)
+                msg = f'Failed to get item {item}: {status} {r.text}'
             else:
                 msg = (
                     f'Failed to get item by name {item}: '
-                    f'{r.status_code} {r.text}, payload {payload}'
+                    f'{status} {r.text}, payload {payload.decode()}'
                 )
             raise exceptions.NetworkRelatedError(msg)
 
-        item.uuid = UUID(r.json()['uuid'])
+        item.uuid = UUID(orjson.loads(r.content)['uuid'])
         self._item_cache[item.uuid] = item
+        self._uuid_by_name[name_key] = item.uuid
 
         return item
 
@@ -171,7 +334,7 @@ class SeleniumClient(_SeleniumClientBase):
                 str(item.real_parent.uuid) if item.real_parent.uuid else None
             )
 
-        payload = json.dumps(
+        payload = orjson.dumps(
             {
                 'uuid': None,
                 'parent_uuid': parent_uuid,
@@ -179,36 +342,46 @@ class SeleniumClient(_SeleniumClientBase):
                 'is_collection': item.is_collection,
                 'tags': item.setup.tags,
                 'permissions': [],
-            },
-            ensure_ascii=False,
+            }
         )
 
-        r = requests.post(  # noqa: S113
-            f'{self.config.url}/api/items',
-            data=payload.encode('utf-8'),
+        r = self.session.post(
+            self._items_url,
+            data=payload,
             **self._common_request_args(item),
         )
 
-        if r.status_code not in (http.HTTPStatus.OK, http.HTTPStatus.CREATED):
+        status = r.status_code
+
+        if status not in (http.HTTPStatus.OK, http.HTTPStatus.CREATED):
+            # parent UUID could be remembered from previous runs
+            # and the parent itself could be deleted on the site since then
+            if item.real_parent is not None:
+                self._forget_item(item.real_parent)
+            self._forget_item(item)
             msg = (
                 f'Failed to create item {item}: '
-                f'{r.status_code} {r.text!r}, payload: {payload}'
+                f'{status} {r.text!r}, payload: {payload.decode()}'
             )
             raise exceptions.NetworkRelatedError(msg)
 
-        item.uuid = UUID(r.json()['uuid'])
+        item.uuid = UUID(orjson.loads(r.content)['uuid'])
         self._item_cache[item.uuid] = item
+        self._uuid_by_name[(item.owner.login, item.name)] = item.uuid
 
         return item
 
     def upload(self, item: models.Item, paths: dict[str, str]) -> None:
         """Crete Item in the API."""
-        # logging in
-        auth_url = self._make_auth_url(item)
-        self.driver.get(f'{auth_url}/login')
+        # logging in, browser keeps credentials until we switch user
+        if self._logged_in_as != item.owner.login:
+            auth_url = self._make_auth_url(item)
+            self.driver.get(f'{auth_url}/login')
+            self._logged_in_as = item.owner.login
 
         if item.setup.treat_as_collection:
-            upload_url = f'{self.config.url}/upload/{item.uuid}'
+            target = item
+            upload_url = f'{self._upload_url}/{item.uuid}'
             LOG.info(
                 'Uploading children of %(item)s using url '
                 '%(url)s with %(total)s items',
@@ -220,7 +393,8 @@ class SeleniumClient(_SeleniumClientBase):
                 },
             )
         elif item.real_parent and item.real_parent.uuid:
-            upload_url = f'{self.config.url}/upload/{item.real_parent.uuid}'
+            target = item.real_parent
+            upload_url = f'{self._upload_url}/{item.real_parent.uuid}'
             LOG.info(
                 'Uploading children of %(item)s '
                 'as a proxy for %(parent)s '
@@ -244,28 +418,38 @@ class SeleniumClient(_SeleniumClientBase):
             msg = f'Item {item} has no real parent: {item.real_parent}'
             raise exceptions.OmoideSyncError(msg)
 
+        try:
+            self._upload_files(item, upload_url, paths)
+        except exceptions.NetworkRelatedError:
+            # collection could be deleted on the site after we cached it
+            self._forget_item(target)
+            raise
+
+    def _upload_files(
+        self,
+        item: models.Item,
+        upload_url: str,
+        paths: dict[str, str],
+    ) -> None:
+        """Send files to the upload page and wait until it is done."""
         self.driver.get(upload_url)
 
-        js_code = 'arguments[0].scrollIntoView();'
+        wait = WebDriverWait(self.driver, self.config.page_load_timeout)
 
-        # turning on simplified upload
-        time.sleep(self.config.wait_for_page_load)
-        auto_checkbox = self.driver.find_element(
-            by='id',
-            value='auto-continue',
-        )
-        self.driver.execute_script(js_code, auto_checkbox)
-
-        time.sleep(self.config.wait_for_page_load)
-        auto_checkbox.click()
+        try:
+            upload_input = wait.until(
+                lambda driver: driver.execute_script(PREPARE_UPLOAD_SCRIPT)
+            )
+        except selenium.common.exceptions.TimeoutException as exc:
+            msg = (
+                f'Upload page for {item} was not ready even after '
+                f'{self.config.page_load_timeout} seconds'
+            )
+            raise exceptions.NetworkRelatedError(msg) from exc
 
         # adding files
-        time.sleep(self.config.wait_for_page_load)
-        upload_input = self.driver.find_element(by='id', value='upload-input')
-        self.driver.execute_script(js_code, upload_input)
-        all_files = '\n'.join(paths[each.name] for each in item.children)
+        all_files = '\n'.join(paths.values())
 
-        time.sleep(self.config.wait_for_page_load)
         # TODO - here we're supposed to add personal tags for items,
         #  but for now it's not yet implemented
         upload_input.send_keys(all_files)
@@ -1,5 +1,6 @@
 """Service logic."""
 
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
 from omoide_sync import cfg
@@ -30,26 +31,60 @@ class Logic(interfaces.AbsLogic):
         try:
             self.client.start()
 
-            for user in users:
-                LOG.debug('Working with user %s', user.name)
-                self.process_single_user(user)
+            # there is only one browser for uploading, but API requests
+            # of different users do not depend on each other
+            with ThreadPoolExecutor(
+                max_workers=self.config.http_concurrency,
+            ) as executor:
+                all_collections = executor.map(
+                    self.prepare_single_user,
+                    users,
+                )
+
+                try:
+                    for user, collections in zip(
+                        users,
+                        all_collections,
+                        strict=True,
+                    ):
+                        self.process_single_user(user, collections)
+                except BaseException:
+                    # do not touch the API for users we will never reach
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
         finally:
             self.client.stop()
 
-    def process_single_user(self, user: models.User) -> None:
-        """Upload data for given user."""
+    def prepare_single_user(self, user: models.User) -> list[models.Item]:
+        """Find or create collections for given user."""
+        collections: list[models.Item] = []
+
         for item in self.storage.get_all_collections(user):
+            # nothing to upload here, do not bother the API
+            if not item.children:
+                continue
+
             if not self.client.get_item(item):
                 self.create_chain(item)
 
+            collections.append(item)
+
+        return collections
+
+    def process_single_user(
+        self,
+        user: models.User,
+        collections: list[models.Item],
+    ) -> None:
+        """Upload data for given user."""
+        LOG.debug('Working with user %s', user.name)
+
+        for item in collections:
             LOG.debug('Processing collection %s', item)
 
             if item.uploaded_enough:
                 continue
 
-            if not item.children:
-                continue
-
             paths = self.storage.get_paths(item)
             self.client.upload(item, paths)
             self.storage.prepare_termination(item)
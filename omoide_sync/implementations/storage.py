@@ -1,8 +1,10 @@
 """Storage handler that can work with actual data."""
 
 from abc import ABC
+from collections.abc import Iterable
 from collections.abc import Iterator
 import logging
+import operator
 import os
 from pathlib import Path
 import shutil
@@ -15,6 +17,11 @@ from omoide_sync import exceptions
 from omoide_sync import interfaces
 from omoide_sync import models
 
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader  # type: ignore[assignment]
+
 LOG = logging.getLogger(__name__)
 
 
@@ -28,39 +35,43 @@ class _FileStorageBase(interfaces.AbsStorage, ABC):
         """Initialize instance."""
         self.config = config
 
+        # TODO - here we could get collision between login and name
+        #  better try to log in as user first and proceed only after that
+        self._auth_by_folder: dict[str, cfg.RawUser] = {}
+        for each in config.auth_data:
+            if not each.get('password'):
+                continue
+
+            # first matching record wins, same as a linear scan
+            self._auth_by_folder.setdefault(each['name'], each)
+            self._auth_by_folder.setdefault(each['login'], each)
+
     def _find_matching_user(self, folder_name: str) -> models.User:
-        """Scan through auth data."""
-        for each in self.config.auth_data:
-            # TODO - here we could get collision between login and name
-            #  better try to log in as user first and proceed only after that
-            if all(
-                (
-                    any(
-                        (
-                            each.get('name') == folder_name,
-                            each.get('login') == folder_name,
-                        )
-                    ),
-                    bool(each.get('password')),
-                )
-            ):
-                return models.User(**each)
+        """Find auth data for given folder."""
+        if raw_user := self._auth_by_folder.get(folder_name):
+            return models.User(**raw_user)
 
         msg = f'Not enough auth data for user {folder_name!r}'
         raise exceptions.UserRelatedError(msg)
 
     @staticmethod
-    def _get_collection_setup(path: Path) -> models.Setup:
+    def _get_collection_setup(
+        path: Path,
+        filenames: Iterable[str] = const.SETUP_FILENAMES,
+    ) -> models.Setup:
         """Load personal settings for this collection."""
         setup = models.Setup()
 
-        for filename in const.SETUP_FILENAMES:
+        for filename in filenames:
             try:
                 with open(path / filename, encoding='utf-8') as f:
-                    raw_setup = yaml.safe_load(f)
+                    raw_setup = yaml.load(f, Loader=YamlLoader)
             except FileNotFoundError:
                 pass
             else:
+                # setup is shared between items, so it must be immutable
+                if 'tags' in raw_setup:
+                    raw_setup['tags'] = tuple(raw_setup['tags'])
                 setup = models.Setup(**raw_setup)
                 break
 
@@ -69,34 +80,57 @@ class _FileStorageBase(interfaces.AbsStorage, ABC):
     def _process_file(
         self,
         user: models.User,
-        path: Path,
+        filename: str,
         parent: models.Item,
-    ) -> models.Item | None:
-        """Return Item instance for given path."""
-        index = path.name.rfind('.')
-        ext = path.name[index:].lower()
-        if ext in self.config.supported_formats:
-            item = models.Item(
-                uuid=None,
-                name=path.name,
-                owner=user,
-                parent=parent,
-                children=[],
-                is_collection=False,
-                uploaded=0,
-                setup=parent.setup,
-            )
-            return item
-        return None
+    ) -> models.Item:
+        """Return Item instance for given filename."""
+        return models.Item(
+            uuid=None,
+            name=filename,
+            owner=user,
+            parent=parent,
+            children=[],
+            is_collection=False,
+            uploaded=0,
+            setup=parent.setup,
+        )
 
-    def _process_folder(
+    def _scan_folder(
         self,
         user: models.User,
         path: Path,
         parent: models.Item | None,
-    ) -> Iterator[models.Item]:
-        """Scan folder and return it as a collection."""
-        setup = self._get_collection_setup(path)
+    ) -> tuple[models.Item, list[Path]]:
+        """Return collection for given folder and its subfolders."""
+        files: list[str] = []
+        folders: list[os.DirEntry[str]] = []
+        setup_filenames: list[str] = []
+        supported_formats = self.config.supported_formats
+
+        # single pass, entry types are already known after reading the dir
+        with os.scandir(path) as iterator:
+            entries = sorted(iterator, key=operator.attrgetter('name'))
+
+        # sorted once, so children and folders keep the order
+        for entry in entries:
+            name = entry.name
+            if name in const.SETUP_FILENAMES:
+                setup_filenames.append(name)
+            elif entry.is_file():
+                _, dot, ext = name.rpartition('.')
+                if (
+                    dot
+                    and not name.startswith('_')
+                    and f'.{ext.lower()}' in supported_formats
+                ):
+                    files.append(name)
+            elif entry.is_dir():
+                folders.append(entry)
+
+        # only open setup files that are actually there
+        setup = models.Setup()
+        if setup_filenames:
+            setup = self._get_collection_setup(path, setup_filenames)
 
         collection = models.Item(
             uuid=None,
@@ -109,35 +143,80 @@ class _FileStorageBase(interfaces.AbsStorage, ABC):
             setup=setup,
         )
 
-        for each in path.iterdir():
-            if each.is_file() and not each.name.startswith('_'):
-                item = self._process_file(user, each, collection)
-                if item:
-                    collection.children.append(item)
+        for filename in files:
+            item = self._process_file(user, filename, collection)
+            collection.children.append(item)
 
-        collection.children.sort(key=lambda _item: _item.name)
+        return collection, [Path(each.path) for each in folders]
 
-        folders = [each for each in path.iterdir() if each.is_dir()]
-        folders.sort(key=lambda _folder: _folder.name)
+    def _process_folder(
+        self,
+        user: models.User,
+        path: Path,
+        parent: models.Item | None,
+    ) -> Iterator[models.Item]:
+        """Scan folder tree and return collections, deepest first."""
+        collection, folders = self._scan_folder(user, path, parent)
+
+        # collections with subfolders that are not visited yet
+        stack = [(collection, iter(folders))]
 
-        for each in folders:
-            yield from self._process_folder(
-                user=user,
-                path=each,
-                parent=collection,
-            )
+        while stack:
+            collection, remaining = stack[-1]
+            folder = next(remaining, None)
 
-        yield collection
+            if folder is None:
+                stack.pop()
+                yield collection
+            else:
+                sub_collection, sub_folders = self._scan_folder(
+                    user=user,
+                    path=folder,
+                    parent=collection,
+                )
+                stack.append((sub_collection, iter(sub_folders)))
 
     @staticmethod
     def _get_item_path(item: models.Item) -> Path:
         """Return relative path to the item and its filename (if any)."""
-        path = Path('.') / item.owner.login
+        # go up only until the first ancestor with known path
+        pending: list[models.Item] = []
+        current: models.Item | None = item
+        while current is not None and current.rel_path is None:
+            pending.append(current)
+            current = current.parent
 
-        for parent in item.ancestors:
-            path = path / parent.name
+        path = Path(item.owner.login)
+        if current is not None and current.rel_path is not None:
+            path = current.rel_path
 
-        return path / item.name
+        for each in reversed(pending):
+            path = path / each.name
+            each.rel_path = path
+
+        return path
+
+    @staticmethod
+    def _move_tree(source_path: Path, dest_path: Path) -> None:
+        """Move folder tree, merging it into destination if it exists.
+
+        Entries are renamed whenever possible, so on the same filesystem
+        no data is copied.
+        """
+        if not dest_path.exists():
+            dest_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(source_path, dest_path)
+            return
+
+        with os.scandir(source_path) as entries:
+            for entry in entries:
+                target = dest_path / entry.name
+                if entry.is_dir(follow_symlinks=False) and target.is_dir():
+                    _FileStorageBase._move_tree(Path(entry.path), target)
+                else:
+                    shutil.move(entry.path, target)
+
+        os.rmdir(source_path)
 
 
 class FileStorage(_FileStorageBase):
@@ -164,12 +243,13 @@ class FileStorage(_FileStorageBase):
         """Return list of users."""
         users: list[models.User] = []
 
-        for folder in self.config.root_folder.iterdir():
-            if folder.is_file():
-                continue
+        with os.scandir(self.config.root_folder) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    continue
 
-            user = self._find_matching_user(folder.name)
-            users.append(user)
+                user = self._find_matching_user(entry.name)
+                users.append(user)
 
         return users
 
@@ -180,22 +260,29 @@ class FileStorage(_FileStorageBase):
         """Iterate on all collections."""
         path = self.config.root_folder / user.login
 
-        folders = list(path.iterdir())
+        with os.scandir(path) as entries:
+            folders = [
+                Path(entry.path)
+                for entry in entries
+                if entry.is_dir() and not entry.name.startswith('_')
+            ]
+
         folders.sort(key=lambda _folder: _folder.name)
 
         for folder in folders:
-            if folder.is_dir() and not folder.name.startswith('_'):
-                yield from self._process_folder(user, folder, parent=None)
+            yield from self._process_folder(user, folder, parent=None)
 
     def get_paths(self, item: models.Item) -> dict[str, str]:
         """Return path to data for every child item."""
-        paths: dict[str, str] = {}
-
-        for child in item.children:
-            child_path = self.config.root_folder / self._get_item_path(child)
-            paths[child.name] = str(child_path.absolute())
+        # children are files right inside the collection folder
+        folder = str(
+            self.config.root_folder.absolute() / self._get_item_path(item)
+        )
 
-        return paths
+        return {
+            child.name: os.path.join(folder, child.name)
+            for child in item.children
+        }
 
     def prepare_termination(self, item: models.Item) -> None:
         """Create resources if need to."""
@@ -226,9 +313,21 @@ class FileStorage(_FileStorageBase):
                     source_path,
                     dest_path,
                 )
+                # children will be moved there one by one, skip copying them
+                skipped = (
+                    {child.name for child in item.children} if move1 else set()
+                )
+
+                def ignore_children(
+                    folder: str, _names: list[str]
+                ) -> set[str]:
+                    """Do not copy files of the collection itself."""
+                    return skipped if folder == str(source_path) else set()
+
                 shutil.copytree(
                     source_path,
                     dest_path,
+                    ignore=ignore_children,
                     dirs_exist_ok=True,
                 )
 
@@ -292,13 +391,7 @@ class FileStorage(_FileStorageBase):
                         source_path,
                         dest_path,
                     )
-                    shutil.copytree(
-                        source_path,
-                        dest_path,
-                        dirs_exist_ok=True,
-                    )
-
-                    shutil.rmtree(source_path)
+                    self._move_tree(source_path, dest_path)
 
             case const.TERMINATION_DELETE:
                 full_path = self.config.root_folder / path
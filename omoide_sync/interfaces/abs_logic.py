@@ -13,7 +13,15 @@ class AbsLogic(abc.ABC):
         """Start processing."""
 
     @abc.abstractmethod
-    def process_single_user(self, user: models.User) -> None:
+    def prepare_single_user(self, user: models.User) -> list[models.Item]:
+        """Find or create collections for given user."""
+
+    @abc.abstractmethod
+    def process_single_user(
+        self,
+        user: models.User,
+        collections: list[models.Item],
+    ) -> None:
         """Upload data for given user."""
 
     @abc.abstractmethod
@@ -26,7 +26,7 @@ class AbsStorage(abc.ABC):
 
     @abc.abstractmethod
     def get_paths(self, item: models.Item) -> dict[str, str]:
-        """Return path to data for every child item."""
+        """Return path to data for every child item, in children order."""
 
     @abc.abstractmethod
     def prepare_termination(self, item: models.Item) -> None:
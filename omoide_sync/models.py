@@ -3,12 +3,13 @@
 from dataclasses import asdict
 from dataclasses import dataclass
 from dataclasses import field
+from pathlib import Path
 from typing import Any
 from typing import Optional
 from uuid import UUID
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     """User representation."""
 
@@ -18,14 +19,14 @@ class User:
     root_item: UUID
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Setup:
     """Personal settings for a collection."""
 
     termination_strategy_collection: str = 'move'
     termination_strategy_item: str = 'move'
     treat_as_collection: bool = True
-    tags: list[str] = field(default_factory=list)
+    tags: tuple[str, ...] = ()
     upload_limit: int = -1
 
     def model_dump(self) -> dict[str, Any]:
@@ -33,7 +34,7 @@ class Setup:
         return asdict(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Item:
     """Item representation."""
 
@@ -45,6 +46,13 @@ class Item:
     is_collection: bool
     uploaded: int
     setup: Setup
+    # relative to the root folder, filled by the storage on first use
+    rel_path: Path | None = field(
+        default=None,
+        init=False,
+        repr=False,
+        compare=False,
+    )
 
     def __repr__(self) -> str:
         """Return string representation."""
@@ -1,6 +1,9 @@
 """Code that prepares application for run."""
 
+import atexit
 import logging
+import logging.handlers
+import queue
 
 from omoide_sync import cfg
 from omoide_sync import const
@@ -11,14 +14,31 @@ from omoide_sync import interfaces
 def setup_logger(config: cfg.Config) -> None:
     """Apply logging settings."""
     log_file_path = config.root_folder / const.LOG_FILENAME
+    formatter = logging.Formatter(
+        '%(asctime)s - %(levelname)7s - %(name)s - %(message)s'
+    )
+
+    handlers: list[logging.Handler] = [
+        logging.FileHandler(log_file_path, encoding='utf-8'),
+        logging.StreamHandler(),
+    ]
+
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    # actual writing is done in background thread
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers)
+    listener.start()
+    atexit.register(listener.stop)
+
+    # message is rendered here, final formatting is up to the listener
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+
     logging.basicConfig(
-        encoding='utf-8',
         level=logging.getLevelName(config.log_level.upper()),
-        format='%(asctime)s - %(levelname)7s - %(name)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file_path, encoding='utf-8'),
-            logging.StreamHandler(),
-        ],
+        handlers=[queue_handler],
     )
 
 